@@ -2,92 +2,96 @@
 import argparse
 import datetime
 import hashlib
+import heapq
+import operator
 import os.path
 import re
+import sys
+from typing import ClassVar, Iterator, Optional, TextIO, Tuple
 
 import requests
 
-DATE_YMD = re.compile('([0-9]{1,4})-([0-9]{1,2})-([0-9]{1,2})')
-DATE_MD = re.compile('([0-9]{1,2})-([0-9]{1,2})')
+# matches every line that is not blank or a comment, capturing the date and the description
+LINE_RE = re.compile(r'^[^\S\n]*([^\s#]+)(?:[^\S\n]+([^\s#][^\n#]*?))?[^\S\n]*(?:#[^\n]*)?$', re.M)
+
+
+def _parse_date(datespec: str) -> Tuple[Optional[int], int, int]:
+    parts = datespec.split('-')
+    if len(parts) == 3:
+        year, month, day = parts
+    elif len(parts) == 2:
+        year = None
+        month, day = parts
+    else:
+        raise ValueError(f'Malformed date: "{datespec}"')
+
+    for part, width in zip(reversed(parts), (2, 2, 4)):
+        if not (part.isascii() and part.isdigit() and len(part) <= width):
+            raise ValueError(f'Malformed date: "{datespec}"')
+
+    return int(year) if year is not None else None, int(month), int(day)
 
 
 class Event:
-    today = datetime.date.today()
+    __slots__ = ('description', 'year', 'month', 'day', 'date', 'next_date', 'days_remaining')
+
+    description: str
+    year: Optional[int]
+    month: int
+    day: int
+    date: datetime.date
+    next_date: datetime.date
+    days_remaining: int
 
-    def __init__(self, description, datespec):
+    today: ClassVar[datetime.date] = datetime.date.today()
+
+    def __init__(self, description: str, datespec: str) -> None:
         self.description = description
 
-        match_ymd = DATE_YMD.match(datespec)
-        match_md = DATE_MD.match(datespec)
-
-        if match_ymd:
-            self.year = int(match_ymd.group(1))
-            self.month = int(match_ymd.group(2))
-            self.day = int(match_ymd.group(3))
-        elif match_md:
-            self.year = None
-            self.month = int(match_md.group(1))
-            self.day = int(match_md.group(2))
-        else:
-            raise ValueError(f'Malformed date: "{datespec}"')
+        self.year, self.month, self.day = _parse_date(datespec)
 
-    @property
-    def date(self):
-        return datetime.date(self.year or datetime.date.min.year, self.month, self.day)
+        self.date = datetime.date(self.year or datetime.date.min.year, self.month, self.day)
 
-    @property
-    def message_id(self):
-        desc = f'{self.date} {self.description}'
-        hsum = hashlib.sha256(desc.encode('utf-8')).hexdigest()
-        return int(hsum, 16) % 0x7fffffff
+        today = Event.today
+        next_date = datetime.date(today.year, self.month, self.day)
+        if next_date < today:
+            next_date = datetime.date(today.year + 1, self.month, self.day)
 
-    @property
-    def next_date(self):
-        ret = self.date.replace(year=self.today.year)
-        if ret < self.today:
-            ret = ret.replace(year=ret.year + 1)
-        return ret
+        self.next_date = next_date
+        self.days_remaining = (next_date - today).days
 
     @property
-    def days_remaining(self):
-        return (self.next_date - self.today).days
+    def message_id(self) -> int:
+        desc = f'{self.date} {self.description}'
+        digest = hashlib.sha256(desc.encode('utf-8')).digest()
+        return int.from_bytes(digest[:4], 'big') & 0x7fffffff
 
     @property
-    def reminder_text(self):
-        ret = self.description
-        if self.year:
-            ret += f' ({self.today.year - self.year})'
+    def reminder_text(self) -> str:
+        age = f' ({self.today.year - self.year})' if self.year else ''
         days = self.days_remaining
         if days == 0:
-            ret += ' today'
+            when = 'today'
         elif days == 1:
-            ret += ' tomorrow'
+            when = 'tomorrow'
+        elif days >= 3:
+            when = f'in {days} days ({self.next_date})'
         else:
-            ret += f' in {int(days)} days'
-            if days >= 3:
-                ret += f' ({self.next_date})'
-        return ret
+            when = f'in {days} days'
+        return f'{self.description}{age} {when}'
 
 
-def parse(fileobj):
+def parse(fileobj: TextIO) -> Iterator[Event]:
+    data = fileobj.read()
     errors = 0
-    for lineno, line in enumerate(fileobj, 1):
-        # remove comments
-        if '#' in line:
-            line = line[:line.find('#')]
-
-        # trim whitespace
-        line = line.strip()
-
-        # skip all empty lines
-        if not line:
-            continue
-
-        # parse line
+    for match in LINE_RE.finditer(data):
+        date, description = match.groups()
         try:
-            date, description = line.split(None, 1)
+            if not description:
+                raise ValueError('Missing description')
             yield Event(description, date)
         except ValueError as e:
+            lineno = data.count('\n', 0, match.start()) + 1
             print(f'{fileobj.name}:{lineno}: {e}')
             errors += 1
     if errors:
@@ -102,8 +106,27 @@ class DayRange:
         self.a = int(elements[0])
         self.b = int(elements[-1])
 
-    def __contains__(self, value):
-        return self.a <= value <= self.b
+    def __iter__(self):
+        # days_remaining is always within 0..365, so there is no point iterating beyond it
+        return iter(range(max(self.a, 0), min(self.b, 365) + 1))
+
+
+def non_negative_int(spec):
+    value = int(spec)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f'must not be negative: {value}')
+    return value
+
+
+def send_wirepusher(session, device_id, event):
+    session.post('https://wirepusher.com/send',
+                 params={
+                     'id': device_id,
+                     'type': 'birthday-reminder',
+                     'title': event.description,
+                     'message': event.reminder_text,
+                     'message_id': event.message_id,
+                     })
 
 
 def main():
@@ -114,6 +137,10 @@ def main():
                         help='birthday file path')
     parser.add_argument('--wirepusher', '-w',
                         help='send notifications using Wirepusher to device with the given ID')
+    parser.add_argument('--limit', '-n',
+                        type=non_negative_int,
+                        default=0,
+                        help='show at most this many upcoming events, 0 means no limit')
     parser.add_argument('days',
                         nargs='*',
                         type=DayRange,
@@ -123,21 +150,21 @@ def main():
 
     events = list(parse(args.file))
 
+    days = frozenset(day for range_ in args.days for day in range_)
     events = [event for event in events
-              if not args.days or any(event.days_remaining in range_ for range_ in args.days)]
-    events.sort(key=lambda e: e.days_remaining)
-
-    for event in events:
-        print(event.reminder_text)
-        if args.wirepusher:
-            requests.post('https://wirepusher.com/send',
-                          params={
-                              'id': args.wirepusher,
-                              'type': 'birthday-reminder',
-                              'title': event.description,
-                              'message': event.reminder_text,
-                              'message_id': event.message_id,
-                              })
+              if not args.days or event.days_remaining in days]
+    if args.limit > 0:
+        events = heapq.nsmallest(args.limit, events, key=operator.attrgetter('days_remaining'))
+    else:
+        events.sort(key=operator.attrgetter('days_remaining'))
+
+    if events:
+        sys.stdout.write('\n'.join(event.reminder_text for event in events) + '\n')
+
+    if args.wirepusher:
+        with requests.Session() as session:
+            for event in events:
+                send_wirepusher(session, args.wirepusher, event)
 
 
 if __name__ == '__main__':
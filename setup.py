@@ -0,0 +1,38 @@
+from setuptools import setup
+from setuptools.command.build_ext import build_ext
+from setuptools.errors import CCompilerError, ExecError, PlatformError
+
+
+class optional_build_ext(build_ext):
+    """Build the compiled module if possible, otherwise keep the pure Python one."""
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except (CCompilerError, ExecError, PlatformError) as e:
+            print(f'warning: compiling {ext.name} failed, installing pure Python module ({e})')
+
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    print('warning: mypyc not available, installing pure Python module')
+    ext_modules = []
+else:
+    try:
+        ext_modules = mypycify(['birthday.py'])
+    except SystemExit:
+        # mypycify exits when type checking fails
+        print('warning: mypyc failed, installing pure Python module')
+        ext_modules = []
+
+setup(
+    name='birthdayreminder',
+    py_modules=['birthday'],
+    ext_modules=ext_modules,
+    cmdclass={'build_ext': optional_build_ext},
+    install_requires=['requests'],
+    entry_points={
+        'console_scripts': ['birthday = birthday:main'],
+    },
+)